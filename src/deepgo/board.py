@@ -131,7 +131,8 @@ def get_board_string(
     return get_array_string(*[v.get_colors() for v in boards], pos=pos)
 
 
-def get_handicap_positions(width: int, height: int, handicap: int) -> List[Tuple[int, int]]:
+@functools.lru_cache(maxsize=32)
+def get_handicap_positions(width: int, height: int, handicap: int) -> Tuple[Tuple[int, int], ...]:
     positions: List[Tuple[int, int]] = []
     ver_line = 3 if width >= 13 else 2
     hor_line = 3 if height >= 13 else 2
@@ -163,7 +164,7 @@ def get_handicap_positions(width: int, height: int, handicap: int) -> List[Tuple
     if handicap == 9:
         positions.append((width // 2, height // 2))
 
-    return positions
+    return tuple(positions)
 
 
 class Board(object):
@@ -324,6 +325,15 @@ class Board(object):
         '''
         return self.native.get_territories(color)
 
+    def get_colors_and_territories(self, color: int = BLACK) -> np.ndarray:
+        '''Get the list of stone colors and the list of confirmed territories at once.
+        Args:
+            color (int): Reference stone color (if WHITE, returns with black and white reversed)
+        Returns:
+            np.ndarray: Stone colors and confirmed territories stacked in the first axis
+        '''
+        return self.native.get_colors_and_territories(color)
+
     def get_owners(self, color: int = BLACK, rule: int = RULE_CH) -> np.ndarray:
         '''Get the list of owners for each position.
         Args:
@@ -360,12 +370,21 @@ class Board(object):
         '''
         return self.native.get_patterns()
 
+    def get_pattern_bytes(self) -> bytes:
+        '''Get values representing the arrangement of stones as bytes.
+        The values are the same as `get_patterns` packed as native 32-bit integers.
+        Returns:
+            bytes: Values representing the arrangement of stones
+        '''
+        return self.native.get_pattern_bytes()
+
     def get_inputs(
         self,
         color: int,
         komi: float,
         rule: int,
         superko: bool,
+        out: np.ndarray | None = None,
     ) -> np.ndarray:
         '''Get the data to input to the inference model.
         Args:
@@ -373,10 +392,11 @@ class Board(object):
             komi (float): Komi points
             rule (int): Rule for determining the winner
             superko (bool): Whether to apply superko rule
+            out (np.ndarray | None): Array to store the input data (allocated if None)
         Returns:
             np.ndarray: Input data
         '''
-        return self.native.get_inputs(color, komi, rule, superko)
+        return self.native.get_inputs(color, komi, rule, superko, out)
 
     def get_state(self) -> List[int]:
         '''Return the serialized value of the board state.
@@ -397,6 +417,15 @@ class Board(object):
         '''
         self.native.copy_from(board.native)
 
+    def copy(self) -> 'Board':
+        '''Create a copy of the board.
+        Returns:
+            Board: Copied board
+        '''
+        board = Board(self.get_width(), self.get_height())
+        board.copy_from(self)
+        return board
+
     def __getstate__(self) -> bytes:
         width = self.get_width()
         height = self.get_height()
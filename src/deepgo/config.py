@@ -56,6 +56,10 @@ MODEL_OUTPUT_SIZE = MODEL_PREDICTIONS * MODEL_SIZE * MODEL_SIZE + MODEL_VALUES
 DEFAULT_SIZE = 19
 # Default komi value
 DEFAULT_KOMI = 7.5
+# Default batch size (used if the batch size is not tuned)
+DEFAULT_BATCH_SIZE = 2048
+# Batch sizes tried when tuning the batch size
+BATCH_SIZE_CANDIDATES = (64, 128, 256, 512, 1024, 2048, 4096)
 
 ################################################################
 # Logging settings
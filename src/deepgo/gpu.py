@@ -1,25 +1,37 @@
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import List, Sequence, Tuple
 
+import numpy as np
 import torch
 
+from .config import BATCH_SIZE_CANDIDATES, DEFAULT_BATCH_SIZE, MODEL_INPUT_SIZE
+from .processor import Processor
+
 LOGGER = logging.getLogger(__name__)
 
 
 def get_default_gpus(
     gpus: Sequence[int] | None,
     fp16: bool,
-) -> Tuple[List[int], bool]:
-    '''Return a list of appropriate GPU IDs and FP16 availability for the execution environment.
+    bf16: bool = False,
+) -> Tuple[List[int], bool, bool]:
+    '''Return a list of appropriate GPU IDs and FP16/BF16 availability
+    for the execution environment.
     If gpus is None, returns a list of available GPU IDs.
     If gpus is specified, returns that list.
-    If -1 is included in gpus, disables FP16 usage.
+    If -1 is included in gpus, disables FP16 and BF16 usage.
+    If a GPU without BF16 support is included, shows a warning and uses FP16 instead.
+    If a GPU without tensor cores is included, shows a warning and disables FP16 usage.
     If invalid GPU IDs are included, shows a warning and ignores them.
     Args:
         gpus (Sequence[int] | None): List of GPU IDs
         fp16 (bool): Whether to use FP16
+        bf16 (bool): Whether to use BF16
     Returns:
-        Tuple[List[int], bool]: List of GPU IDs and FP16 availability
+        Tuple[List[int], bool, bool]: List of GPU IDs and FP16/BF16 availability
     '''
     # If CUDA is available
     if torch.cuda.is_available():
@@ -65,11 +77,123 @@ def get_default_gpus(
     if len(new_gpus) == 0:
         new_gpus = [-1]
 
-    # If -1 is included in the list of GPU IDs, disable FP16 usage
+    # If -1 is included in the list of GPU IDs, disable FP16 and BF16 usage
     if -1 in new_gpus:
         new_fp16 = False
-    # Otherwise, set FP16 availability
+        new_bf16 = False
+    # Otherwise, set FP16 and BF16 availability
+    # (BF16 is used only if all GPUs support it (compute capability 8.0 or higher))
     else:
         new_fp16 = fp16
+        new_bf16 = bf16
+
+        if bf16 and not (torch.cuda.is_available() and all(
+                torch.cuda.get_device_capability(gpu)[0] >= 8 for gpu in new_gpus)):
+            LOGGER.warning('BF16 is not supported, FP16 is used instead')
+            new_fp16 = True
+            new_bf16 = False
+
+        # FP16 is slower than FP32 on GPUs without tensor cores (compute capability below 7.0)
+        if new_fp16 and not new_bf16 and torch.cuda.is_available():
+            capability = min(torch.cuda.get_device_capability(gpu)[0] for gpu in new_gpus)
+
+            if capability < 7:
+                LOGGER.warning('FP16 is not effective without tensor cores, FP32 is used instead')
+                new_fp16 = False
+            elif capability >= 8:
+                LOGGER.info('BF16 is supported and recommended instead of FP16')
+
+    return new_gpus, new_fp16, new_bf16
+
+
+def get_default_batch_size(
+    model: str | Path,
+    gpus: Sequence[int],
+    fp16: bool = False,
+    bf16: bool = False,
+    optimize: bool = False,
+    repeats: int = 5,
+    memory_ratio: float = 0.85,
+) -> int:
+    '''Return the batch size that gives the best inference throughput on the GPUs.
+    Throughput is measured for each batch size in BATCH_SIZE_CANDIDATES,
+    and the smallest batch size that achieves 95% of the best throughput is returned.
+    Larger batch sizes are not tried if the GPU memory usage would exceed the given ratio.
+    If CUDA is not used, returns DEFAULT_BATCH_SIZE.
+    Args:
+        model (str | Path): Path to model file
+        gpus (Sequence[int]): List of GPU IDs
+        fp16 (bool): Whether to use FP16
+        bf16 (bool): Whether to use BF16
+        optimize (bool): Whether to freeze the model and optimize it for inference
+        repeats (int): Number of inference runs for each batch size
+        memory_ratio (float): Maximum ratio of GPU memory usage
+    Returns:
+        int: Batch size
+    '''
+    if not torch.cuda.is_available() or -1 in gpus:
+        return DEFAULT_BATCH_SIZE
+
+    # Measure with the first GPU (all GPUs are assumed to be the same)
+    gpu = gpus[0]
+    total_memory = torch.cuda.get_device_properties(gpu).total_memory
+    processor = Processor(model, [gpu], max(BATCH_SIZE_CANDIDATES), fp16, bf16, optimize)
+    throughputs: List[Tuple[int, float]] = []
+
+    for batch_size in BATCH_SIZE_CANDIDATES:
+        inputs = np.zeros((batch_size, MODEL_INPUT_SIZE), dtype=np.float32)
+
+        # Warm up (and measure the memory usage of this batch size)
+        torch.cuda.reset_peak_memory_stats(gpu)
+        processor.execute(inputs)
+        memory = torch.cuda.max_memory_allocated(gpu)
+
+        # Measure the throughput
+        start = time.perf_counter()
+
+        for _ in range(repeats):
+            processor.execute(inputs)
+
+        throughput = batch_size * repeats / (time.perf_counter() - start)
+        throughputs.append((batch_size, throughput))
+        LOGGER.debug(
+            'Batch size %d: %.1f boards/sec, %.1f MiB', batch_size, throughput, memory / 2**20)
+
+        # Stop if the memory usage would exceed the limit with the next (doubled) batch size
+        if memory * 2 > total_memory * memory_ratio:
+            break
+
+    del processor
+
+    best_throughput = max(t for _, t in throughputs)
+
+    return min(b for b, t in throughputs if t >= best_throughput * 0.95)
+
+
+def warm_up_processor(
+    processor: Processor,
+    gpus: Sequence[int],
+    batch_size: int,
+    threads_par_gpu: int = 1,
+    sizes: Sequence[int] = (1, 8, 64),
+) -> None:
+    '''Run inference in advance with the batch sizes used during search.
+    cuDNN selects algorithms at the first inference of each input shape,
+    so running it here keeps the selection time out of the first move.
+    Args:
+        processor (Processor): Inference processor
+        gpus (Sequence[int]): List of GPU IDs used by the processor
+        batch_size (int): Maximum batch size of the processor
+        threads_par_gpu (int): Number of threads per GPU of the processor
+        sizes (Sequence[int]): Batch sizes to run in addition to the maximum batch size
+    '''
+    if not torch.cuda.is_available() or -1 in gpus:
+        return
+
+    # Run the same batch on all threads at once so that every executor receives it
+    executors = len(gpus) * threads_par_gpu
 
-    return new_gpus, new_fp16
+    with ThreadPoolExecutor(max_workers=executors) as pool:
+        for size in sorted({min(s, batch_size) for s in (*sizes, batch_size)}):
+            inputs = np.zeros((size, MODEL_INPUT_SIZE), dtype=np.float32)
+            list(pool.map(processor.execute, [inputs] * executors))
@@ -21,6 +21,9 @@ from .processor import Processor
 
 LOGGER = logging.getLogger(__name__)
 
+# Two-digit hexadecimal strings of byte values
+HEX_STRINGS = np.array([f'{i:02x}' for i in range(256)])
+
 
 def gtp_string_to_position(s: str, width: int, height: int) -> Tuple[int, int] | None:
     '''Convert GTP string representation to coordinate values.
@@ -91,6 +94,19 @@ def gtp_position_to_string(p: Tuple[int, int] | None, width: int, height: int) -
     return f'{x_char}{y_char}'
 
 
+def gtp_position_strings(width: int, height: int) -> List[List[str]]:
+    '''Create GTP string representations of all coordinates on the board.
+    Args:
+        width (int): Board width
+        height (int): Board height
+    Returns:
+        List[List[str]]: GTP string representations (indexed by [y][x])
+    '''
+    return [
+        [gtp_position_to_string((x, y), width, height) for x in range(width)]
+        for y in range(height)]
+
+
 def gtp_color_to_string(c: int) -> str:
     '''Convert stone color to string representation.
     Args:
@@ -205,6 +221,22 @@ def kata_candidate_to_string(
     return candidate_text.strip()
 
 
+def territories_to_ownerships(territories: np.ndarray, color: int) -> np.ndarray:
+    '''Convert predicted territory to ownership values from the viewpoint of the specified color.
+    Args:
+        territories (np.ndarray): Territory data
+        color (int): Color of the viewpoint
+    Returns:
+        np.ndarray: Ownership values (positive for black)
+    '''
+    ownerships = (
+        np.maximum(territories[2] - territories[1], 0)
+        - np.maximum(territories[0] - territories[1], 0))
+
+    # Adding zero avoids negative zeros (printed as '-0.00')
+    return ownerships if color == BLACK else -ownerships + 0.0
+
+
 def kata_candidates_to_string(
     candidates: List[Candidate],
     territories: np.ndarray,
@@ -233,12 +265,8 @@ def kata_candidates_to_string(
     root_text = (f'rootInfo winrate {win_chance:.4f} visits {visits} scoreLead {score:.1f}')
 
     # Create territory string
-    def territory_to_string(t: np.ndarray) -> str:
-        v = max(float(t[2] - t[1]), 0) - max(float(t[0] - t[1]), 0)
-        return f'{v:.2f}' if candidates[0].color == BLACK else f'{-v:.2f}'
-
-    ownership_values = ' '.join(
-        territory_to_string(territories[:, y, x]) for y, x in np.ndindex(height, width))
+    ownerships = territories_to_ownerships(territories, candidates[0].color)
+    ownership_values = ' '.join(f'{v:.2f}' for v in ownerships.ravel().tolist())
     ownership_text = f'ownership {ownership_values}'
 
     return f'{candidates_text} {root_text} {ownership_text}'
@@ -287,14 +315,10 @@ def cgos_candidates_to_string(
     root_values['moves'] = move_values
 
     # Set territory values
-    def territory_to_string(t: np.ndarray) -> str:
-        c = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+'
-        v = max(float(t[2] - t[1]), 0) - max(float(t[0] - t[1]), 0)
-        v = v if candidates[0].color == BLACK else -v
-        return c[round(max(0, min((v + 1) / 2, 1)) * 62)]
-
-    root_values['ownership'] = ''.join(
-        territory_to_string(territories[:, y, x]) for y, x in np.ndindex(height, width))
+    chars = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+'
+    ownerships = territories_to_ownerships(territories, candidates[0].color)
+    indices = np.round(np.clip((ownerships + 1) / 2, 0, 1) * 62).astype(np.int32)
+    root_values['ownership'] = ''.join(chars[i] for i in indices.ravel().tolist())
 
     return json.dumps(root_values)
 
@@ -379,6 +403,7 @@ class GTPEngine(object):
         komi: float = DEFAULT_KOMI,
         superko: bool = False,
         eval_leaf_only: bool = False,
+        virtual_loss: float = 0.0,
         timelimit: float = 10,
         ponder: bool = False,
         resign_threshold: float = 0.0,
@@ -405,6 +430,7 @@ class GTPEngine(object):
             komi: float: Komi value
             superko (bool): True to apply superko rule
             eval_leaf_only (bool): True to evaluate only leaf nodes
+            virtual_loss (float): Weight of the virtual loss added to nodes being searched
             timelimit (float): Maximum thinking time
             ponder (bool): True to continue analysis during opponent's turn
             resign_threshold (float): Win rate for resignation
@@ -431,9 +457,11 @@ class GTPEngine(object):
 
         self.rule = rule
         self.size = boardsize
+        self.position_strings = gtp_position_strings(boardsize, boardsize)
         self.komi = komi
         self.superko = superko
         self.eval_leaf_only = eval_leaf_only
+        self.virtual_loss = virtual_loss
         self.timelimit = timelimit
         self.ponder = ponder
         self.remain_times = [-1, -1]
@@ -544,8 +572,10 @@ class GTPEngine(object):
         '''
         LOGGER.debug(
             'Create player: '
-            'width=%d, height=%d, komi=%.1f, rule=%d, superko=%s, eval_leaf_only=%s',
-            self.size, self.size, self.komi, self.rule, self.superko, self.eval_leaf_only)
+            'width=%d, height=%d, komi=%.1f, rule=%d, superko=%s, eval_leaf_only=%s, '
+            'virtual_loss=%.1f',
+            self.size, self.size, self.komi, self.rule, self.superko, self.eval_leaf_only,
+            self.virtual_loss)
 
         return Player(
             processor=self.processor,
@@ -555,7 +585,8 @@ class GTPEngine(object):
             komi=self.komi,
             rule=self.rule,
             superko=self.superko,
-            eval_leaf_only=self.eval_leaf_only
+            eval_leaf_only=self.eval_leaf_only,
+            virtual_loss=self.virtual_loss,
         )
 
     def _random_move(self, color: int) -> Candidate:
@@ -586,6 +617,7 @@ class GTPEngine(object):
         visits: int | None = None,
         playouts: int | None = None,
         timelimit: float | None = None,
+        ponder: bool | None = None,
     ) -> List[Candidate]:
         '''Evaluate the board.
         Args:
@@ -593,6 +625,7 @@ class GTPEngine(object):
             visits (int | None): Target number of visits
             playouts (int | None): Target number of playouts
             timelimit (float | None): Maximum thinking time
+            ponder (bool | None): True to continue searching after evaluation
         Returns:
             List[Candidate]: List of candidate moves
         '''
@@ -618,6 +651,10 @@ class GTPEngine(object):
         if timelimit is None:
             timelimit = self._get_timelimit(color)
 
+        # Set pondering
+        if ponder is None:
+            ponder = self.ponder
+
         # Evaluate the board
         LOGGER.debug(
             'Evaluate: color=%s, visits=%d, playouts=%d, timelimit=%.1f',
@@ -630,7 +667,7 @@ class GTPEngine(object):
             timelimit=timelimit,
             temperature=self.temperature,
             criterion=self.criterion,
-            ponder=self.ponder)
+            ponder=ponder)
 
         # Return list of candidate moves
         return candidates
@@ -653,7 +690,7 @@ class GTPEngine(object):
 
         # 着手した後の予想領域を取得する
         # Get predicted territory after move
-        board = self.player.get_board()
+        board = self.player.get_board(copy=False)
         territories = self.player.get_territories(
             pos=candidate.pos, color=candidate.color, raw=True)
         score = territories[2].sum() - territories[0].sum()
@@ -669,24 +706,12 @@ class GTPEngine(object):
             # If no pass has occurred, check if all boundary territories are fixed
             if PASS not in [m[0] for m in self.moves]:
                 owners = territories.argmax(axis=0) - 1
-                colors = board.get_colors()
-
-                for x, y in np.ndindex(self.size, self.size):
-                    if colors[y, x] != EMPTY:
-                        continue
-
-                    for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                        nx = x + dx
-                        ny = y + dy
-
-                        if not is_valid_position((nx, ny), self.size, self.size):
-                            continue
-                        elif owners[y, x] != owners[ny, nx]:
-                            boundary_fixed = False
-                            break
+                empties = board.get_colors() == EMPTY
 
-                    if not boundary_fixed:
-                        break
+                # A boundary is not fixed if adjacent owners differ next to an empty point
+                hor_changes = (owners[:, 1:] != owners[:, :-1]) & (empties[:, 1:] | empties[:, :-1])
+                ver_changes = (owners[1:, :] != owners[:-1, :]) & (empties[1:, :] | empties[:-1, :])
+                boundary_fixed = not (hor_changes.any() or ver_changes.any())
 
             # If all boundary territories are fixed, check predicted score difference for passing
             # If predicted score difference is below threshold (0.8), pass
@@ -752,6 +777,11 @@ class GTPEngine(object):
                 if not cont or self.terminated:
                     self.writer.write('\n\n')
                     self.writer.flush()
+
+                    # Stop the search kept running between continuous responses
+                    if cont and not self.ponder and self.player is not None:
+                        self.player.stop_evaluation()
+
                     break
             except BaseException as e:
                 LOGGER.error('GTP error: %s', str(e))
@@ -814,6 +844,8 @@ class GTPEngine(object):
             return (False, 'can not change boardsize after the game starts', False)
 
         self.size = int(args[0])
+        self.position_strings = gtp_position_strings(self.size, self.size)
+
         return (True, '', False)
 
     def _perform_command_clear_board(self, args: List[str]) -> Tuple[bool, str, bool]:
@@ -898,7 +930,7 @@ class GTPEngine(object):
 
         # If not pass, check if move is legal and position is valid
         if (is_valid_position(pos, self.size, self.size)
-                and not self.player.get_board().is_enabled(pos, color)):
+                and not self.player.get_board(copy=False).is_enabled(pos, color)):
             return (False, 'illegal move', False)
 
         # Execute move
@@ -914,7 +946,7 @@ class GTPEngine(object):
 
         # Output log
         if LOGGER.isEnabledFor(logging.DEBUG):
-            colors = self.player.get_board().get_colors()
+            colors = self.player.get_board(copy=False).get_colors()
             territories = self.player.get_territories()
             LOGGER.debug(
                 'Played: color=%s, pos=%s\n%s',
@@ -979,7 +1011,7 @@ class GTPEngine(object):
 
         # Output log
         if LOGGER.isEnabledFor(logging.DEBUG):
-            colors = self.player.get_board().get_colors()
+            colors = self.player.get_board(copy=False).get_colors()
             territories = self.player.get_territories()
             LOGGER.debug(
                 'Played: color=%s, pos=%s, score=%.1f\n%s',
@@ -998,12 +1030,14 @@ class GTPEngine(object):
         analyze_func: Callable[
             [List[Candidate], np.ndarray, float, int, int], str] = lz_candidates_to_string,
         play: bool = True,
+        use_score: bool = False,
     ) -> Tuple[bool, str, bool]:
         '''Execute genmove_analyze command.
         Args:
             args (List[str]): Argument list
             analyze_func (Callable): Analysis function
             play (bool): True to execute move
+            use_score (bool): True if the analysis function outputs the predicted score
         Returns:
             Tuple[bool, str, bool]: (True if successful, message, True to continue)
         '''
@@ -1030,14 +1064,18 @@ class GTPEngine(object):
             else:
                 candidates = self._evaluate(color)
         else:
-            candidates = self._evaluate(color, visits=100_000, timelimit=interval)
+            # Keep searching between responses so that the search tree keeps growing
+            candidates = self._evaluate(
+                color, visits=100_000, timelimit=interval, ponder=True)
 
         # Create move coordinates
         pos, score, territories = self._get_move(candidates[0])
 
         # If pass, set final predicted score
-        if pos == PASS:
-            score = self.player.get_final_score()
+        # (calculated from the territory predicted after passing)
+        if pos == PASS and use_score:
+            score = self.player.get_final_score(
+                (territories.argmax(axis=0) - 1).astype(np.int8))
 
         # Create analysis result string
         analyze_line = analyze_func(candidates, territories, score, self.size, self.size)
@@ -1066,7 +1104,7 @@ class GTPEngine(object):
         self, args: List[str], play: bool = True
     ) -> Tuple[bool, str, bool]:
         return self._perform_command_lz_genmove_analyze(
-            args, kata_candidates_to_string, play=play)
+            args, kata_candidates_to_string, play=play, use_score=True)
 
     def _perform_command_kata_analyze(self, args: List[str]) -> Tuple[bool, str, bool]:
         return self._perform_command_kata_genmove_analyze(args, play=False)
@@ -1075,7 +1113,7 @@ class GTPEngine(object):
         self, args: List[str], play: bool = True,
     ) -> Tuple[bool, str, bool]:
         return self._perform_command_lz_genmove_analyze(
-            args, cgos_candidates_to_string, play=play)
+            args, cgos_candidates_to_string, play=play, use_score=True)
 
     def _perform_command_cgos_analyze(self, args: List[str]) -> Tuple[bool, str, bool]:
         return self._perform_command_cgos_genmove_analyze(args, play=False)
@@ -1113,7 +1151,7 @@ class GTPEngine(object):
         if self.player is None:
             return (False, 'game has not started yet', False)
 
-        board = self.player.get_board()
+        board = self.player.get_board(copy=False)
         territory = self.player.get_territories()
         colors = board.get_colors()
 
@@ -1126,9 +1164,8 @@ class GTPEngine(object):
         else:
             return (False, 'invalid status string', False)
 
-        positions = [
-            gtp_position_to_string((x, y), self.size, self.size)
-            for x, y in np.ndindex(self.size, self.size) if values[y, x]]
+        xs, ys = np.nonzero(values.T)
+        positions = [self.position_strings[y][x] for x, y in zip(xs, ys)]
         texts = [' '.join(positions[i:i + 20]) for i in range(0, len(positions), 20)]
 
         return (True, '\n'.join(texts), False)
@@ -1175,11 +1212,10 @@ class GTPEngine(object):
             return (False, 'game has not started yet', False)
 
         values = self.player.get_values()
-        text = ['']
-
-        for vs in values:
-            vs = [(int(max(v, 0) * 255), int(max(-v, 0) * 255)) for v in vs]
-            text.append(' '.join('#{:02x}00{:02x}'.format(r, b) for r, b in vs))
+        reds = HEX_STRINGS[(np.clip(values, 0, 1) * 255).astype(np.uint8)]
+        blues = HEX_STRINGS[(np.clip(-values, 0, 1) * 255).astype(np.uint8)]
+        cells = np.char.add(np.char.add('#', reds), np.char.add('00', blues))
+        text = [''] + [' '.join(vs) for vs in cells]
 
         return (True, '\n'.join(text), False)
 
@@ -1193,7 +1229,7 @@ class GTPEngine(object):
 
     def __str__(self) -> str:
         if self.player is not None:
-            board = self.player.get_board()
+            board = self.player.get_board(copy=False)
             captured_black = self.player.get_captured(BLACK)
             captured_white = self.player.get_captured(WHITE)
         else:
@@ -1202,25 +1238,21 @@ class GTPEngine(object):
             captured_white = 0
 
         colors = board.get_colors()
-        chars = [
-            gtp_position_to_string((i, i), self.size, self.size) for i in range(self.size)]
-
-        def mark(x: int, y: int, c: int) -> str:
-            if c == BLACK:
-                return 'X'
-            elif c == WHITE:
-                return 'O'
-            elif (x - 3) % 6 == 0 and (y - 3) % 6 == 0:
-                return '+'
-            else:
-                return '.'
+        chars = [self.position_strings[i][i] for i in range(self.size)]
+
+        # Create marks of all positions at once
+        lines = np.arange(self.size)
+        marks = np.full(colors.shape, '.', dtype='U1')
+        marks[((lines[:, None] - 3) % 6 == 0) & ((lines[None, :] - 3) % 6 == 0)] = '+'
+        marks[colors == BLACK] = 'X'
+        marks[colors == WHITE] = 'O'
 
         texts = ['   ' + ' '.join(chars[x][0] for x in range(self.size))]
 
         for y in range(self.size):
             lnum = '{:>2s} '.format(chars[y][1:])
             rnum = ' {:<2s}'.format(chars[y][1:])
-            line = ' '.join(mark(x, y, colors[y, x]) for x in range(self.size))
+            line = ' '.join(marks[y])
             texts.append(lnum + line + rnum)
 
         texts[-2] += f'    WHITE (O) has captured {captured_black} stones'
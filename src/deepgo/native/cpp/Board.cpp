@@ -254,7 +254,7 @@ int32_t Board::getColor(int32_t x, int32_t y) {
  * @param colors Stone color data
  * @param color Stone color
  */
-void Board::getColors(int32_t* colors, int32_t color) {
+void Board::getColors(int8_t* colors, int32_t color) {
   for (int32_t y = 0; y < _height - 2; y++) {
     for (int32_t x = 0; x < _width - 2; x++) {
       colors[y * (_width - 2) + x] = getColor(x, y) * color;
@@ -347,7 +347,7 @@ void Board::getEnableds(int32_t* enableds, int32_t color, bool checkSeki) {
  * @param territories Data of fixed territories
  * @param color Reference stone color (set WHITE to return data judged for black and white)
  */
-void Board::getTerritories(int32_t* territories, int32_t color) {
+void Board::getTerritories(int8_t* territories, int32_t color) {
   // Update empty area data
   _updateArea();
 
@@ -385,15 +385,18 @@ void Board::getTerritories(int32_t* territories, int32_t color) {
  */
 void Board::getOwners(int32_t* owners, int32_t color, int32_t rule) {
   // Get data of fixed territories
-  getTerritories(owners, color);
+  std::unique_ptr<int8_t[]> territories(new int8_t[(_width - 2) * (_height - 2)]);
+  getTerritories(territories.get(), color);
 
   // Set owner of stones in unfixed territories
   for (int32_t y = 0; y < _height - 2; y++) {
     for (int32_t x = 0; x < _width - 2; x++) {
       int32_t owner_index = y * (_width - 2) + x;
 
-      if (owners[owner_index] == EMPTY) {
+      if (territories[owner_index] == EMPTY) {
         owners[owner_index] = getColor(x, y) * color;
+      } else {
+        owners[owner_index] = territories[owner_index];
       }
     }
   }
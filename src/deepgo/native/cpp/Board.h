@@ -89,7 +89,7 @@ class Board {
    * @param colors Data of stone colors
    * @param color Color of the stone
    */
-  void getColors(int32_t* colors, int32_t color);
+  void getColors(int8_t* colors, int32_t color);
 
   /**
    * Gets the size of the group at the specified coordinates.
@@ -138,7 +138,7 @@ class Board {
    * @param territories Data of fixed territory
    * @param color Reference stone color (if WHITE is set, returns data judged for both black and white)
    */
-  void getTerritories(int32_t* territories, int32_t color);
+  void getTerritories(int8_t* territories, int32_t color);
 
   /**
    * Returns the data of the owner of each coordinate.
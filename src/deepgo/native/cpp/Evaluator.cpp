@@ -53,7 +53,7 @@ void Evaluator::evaluate(Board* board, int32_t color) {
 
   // Create a list of candidate moves
   std::unique_ptr<int32_t[]> enableds(new int32_t[width * height]);
-  std::unique_ptr<int32_t[]> territories(new int32_t[width * height]);
+  std::unique_ptr<int8_t[]> territories(new int8_t[width * height]);
   int32_t offset_x = (MODEL_SIZE - width) / 2;
   int32_t offset_y = (MODEL_SIZE - height) / 2;
 
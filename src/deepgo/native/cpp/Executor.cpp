@@ -12,13 +12,16 @@ namespace deepgo {
  * @param gpu GPU number
  * @param batchSize Maximum batch size
  * @param fp16 True to compute with 16-bit precision
+ * @param bf16 True to compute with bfloat16 (on CUDA)
+ * @param optimize True to freeze the model and optimize it for inference
  * @param deterministic True to make computation results reproducible
  */
 Executor::Executor(
-    std::string model, int32_t gpu, int32_t batchSize, bool fp16, bool deterministic)
+    std::string model, int32_t gpu, int32_t batchSize,
+    bool fp16, bool bf16, bool optimize, bool deterministic)
     : _mutex(),
       _condition(),
-      _model(new Model(model, gpu, fp16, deterministic)),
+      _model(new Model(model, gpu, fp16, bf16, optimize, deterministic)),
       _thread(),
       _terminated(false),
       _queue(),
@@ -1,5 +1,9 @@
 #include "Model.h"
 
+#include <ATen/autocast_mode.h>
+#include <c10/core/StreamGuard.h>
+#include <c10/core/impl/VirtualGuardImpl.h>
+
 #include <iostream>
 
 #include "Config.h"
@@ -31,18 +35,15 @@ static at::Device getDevice(int32_t gpu) {
 }
 
 /**
- * Get the scalar type used in the execution environment.
- * @param gpu GPU number
+ * Get the scalar type of the model parameters used in the execution environment.
+ * On CUDA, parameters are kept in Float32 and 16-bit precision is applied by autocast.
+ * @param device Execution device
  * @param fp16 True to compute with 16-bit precision
  * @return Scalar type
  */
-static at::ScalarType getScalarType(int32_t gpu, bool fp16) {
-  // Use Half if calculating with 16-bit precision using CUDA
-  if (torch::cuda::is_available() && gpu >= 0 && fp16) {
-    return at::kHalf;
-  }
+static at::ScalarType getScalarType(const at::Device& device, bool fp16) {
   // Use Half if calculating with 16-bit precision using MPS
-  else if (torch::mps::is_available() && gpu == 0 && fp16) {
+  if (device.is_mps() && fp16) {
     return at::kHalf;
   }
   // Otherwise, use Float32
@@ -51,17 +52,46 @@ static at::ScalarType getScalarType(int32_t gpu, bool fp16) {
   }
 }
 
+/**
+ * Get the scalar type used for automatic mixed precision.
+ * @param device Execution device
+ * @param fp16 True to compute with 16-bit precision
+ * @param bf16 True to compute with bfloat16
+ * @return Scalar type (Float32 if automatic mixed precision is not used)
+ */
+static at::ScalarType getAutocastType(const at::Device& device, bool fp16, bool bf16) {
+  // Use automatic mixed precision only when calculating with 16-bit precision using CUDA
+  if (!device.is_cuda() || !(fp16 || bf16)) {
+    return at::kFloat;
+  }
+  // Use BFloat16 if specified
+  else if (bf16) {
+    return at::kBFloat16;
+  }
+  // Otherwise, use Half
+  else {
+    return at::kHalf;
+  }
+}
+
 /**
  * Constructor.
  * If GPU number is -1, creates an object that computes on CPU.
  * @param filename Model file
  * @param gpu GPU number
  * @param fp16 True to compute with 16-bit precision
+ * @param bf16 True to compute with bfloat16 (on CUDA)
+ * @param optimize True to freeze the model and optimize it for inference
  * @param deterministic True to make computation results reproducible
  */
-Model::Model(std::string filename, int32_t gpu, bool fp16, bool deterministic)
+Model::Model(
+    std::string filename, int32_t gpu, bool fp16, bool bf16, bool optimize,
+    bool deterministic)
     : _device(getDevice(gpu)),
-      _dtype(getScalarType(gpu, fp16)) {
+      _dtype(getScalarType(_device, fp16 || bf16)),
+      _autocastType(getAutocastType(_device, fp16, bf16)),
+      _stream(),
+      _inputBuffer() {
   if (torch::cuda::is_available()) {
     torch::globalContext().setUserEnabledCuDNN(true);
 
@@ -77,6 +107,16 @@ Model::Model(std::string filename, int32_t gpu, bool fp16, bool deterministic)
   _model = torch::jit::load(filename);
   _model.to(_device, _dtype);
   _model.eval();
+
+  // Fold constants and fuse operations such as convolution and batch normalization
+  if (optimize) {
+    _model = torch::jit::optimize_for_inference(_model);
+  }
+
+  // Use a dedicated stream so that inference by other models on the same GPU can overlap
+  if (_device.is_cuda()) {
+    _stream = c10::impl::VirtualGuardImpl(_device.type()).getStreamFromGlobalPool(_device);
+  }
 }
 
 /**
@@ -86,14 +126,47 @@ Model::Model(std::string filename, int32_t gpu, bool fp16, bool deterministic)
  * @param size Number of evaluation data
  */
 void Model::forward(float* inputs, float* outputs, uint32_t size) {
-  torch::NoGradGuard no_grad;
-  torch::Tensor in_data = torch::from_blob(
-      inputs, size * MODEL_INPUT_SIZE,
-      torch::TensorOptions().dtype(torch::kFloat32));
-  in_data = in_data.reshape({size, MODEL_INPUT_SIZE});
-  in_data = in_data.to(_device, _dtype);
+  // Disable autograd, version counters and view tracking during inference
+  c10::InferenceMode inference_mode;
+  c10::OptionalStreamGuard stream_guard(_stream);
+  torch::Tensor in_data;
+
+  // On CUDA, copy input data through a page-locked buffer to transfer it asynchronously
+  // (the buffer can be reused after this method because outputs are copied synchronously)
+  if (_device.is_cuda()) {
+    if (!_inputBuffer.defined() || _inputBuffer.size(0) < size) {
+      _inputBuffer = torch::empty(
+          {size, MODEL_INPUT_SIZE},
+          torch::TensorOptions().dtype(torch::kFloat32).pinned_memory(true));
+    }
+
+    in_data = _inputBuffer.narrow(0, 0, size);
+    memcpy(in_data.data_ptr(), inputs, sizeof(float) * size * MODEL_INPUT_SIZE);
+    in_data = in_data.to(_device, _dtype, /*non_blocking=*/true);
+  } else {
+    in_data = torch::from_blob(
+        inputs, size * MODEL_INPUT_SIZE,
+        torch::TensorOptions().dtype(torch::kFloat32));
+    in_data = in_data.reshape({size, MODEL_INPUT_SIZE});
+    in_data = in_data.to(_device, _dtype);
+  }
+
+  // Compute with automatic mixed precision if enabled
+  // (autocast state is thread local, so it is set in the thread running inference)
+  bool autocast = _autocastType != at::kFloat;
+
+  if (autocast) {
+    at::autocast::set_autocast_enabled(at::kCUDA, true);
+    at::autocast::set_autocast_dtype(at::kCUDA, _autocastType);
+  }
 
   torch::Tensor out_data = _model.forward({in_data}).toTensor();
+
+  if (autocast) {
+    at::autocast::set_autocast_enabled(at::kCUDA, false);
+    at::autocast::clear_cache();
+  }
+
   out_data = out_data.reshape({-1});
   out_data = out_data.to(torch::kCPU, torch::kFloat32).contiguous();
   memcpy(outputs, out_data.data_ptr(), sizeof(float) * out_data.numel());
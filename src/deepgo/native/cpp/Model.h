@@ -5,6 +5,7 @@
 #include <torch/torch.h>
 
 #include <cstdint>
+#include <optional>
 #include <string>
 
 namespace deepgo {
@@ -17,9 +18,13 @@ class Model {
    * @param filename Model file
    * @param gpu GPU number
    * @param fp16 True to compute with 16-bit precision
+   * @param bf16 True to compute with bfloat16 (on CUDA)
+   * @param optimize True to freeze the model and optimize it for inference
    * @param deterministic True to make computation results reproducible
    */
-  Model(std::string filename, int32_t gpu, bool fp16, bool deterministic);
+  Model(
+      std::string filename, int32_t gpu, bool fp16, bool bf16, bool optimize,
+      bool deterministic);
 
   /**
    * Destructor.
@@ -52,9 +57,24 @@ class Model {
   at::Device _device;
 
   /**
-   * Data type used for computation.
+   * Data type of the model parameters.
    */
   at::ScalarType _dtype;
+
+  /**
+   * Data type used for automatic mixed precision (Float32 if not used).
+   */
+  at::ScalarType _autocastType;
+
+  /**
+   * Stream used for inference (only on CUDA).
+   */
+  std::optional<c10::Stream> _stream;
+
+  /**
+   * Page-locked host buffer for input data (only on CUDA).
+   */
+  torch::Tensor _inputBuffer;
 };
 
 }  // namespace deepgo
@@ -41,7 +41,8 @@ Node::Node(
       _visits(0),
       _playouts(0),
       _value(0.0f),
-      _count(0) {
+      _count(0),
+      _virtualLoss(0.0f) {
 }
 
 /**
@@ -244,6 +245,25 @@ void Node::cancelValue(float value) {
   _value -= value;
 }
 
+/**
+ * Adds a virtual loss to the search node while it is being searched.
+ * Other threads are less likely to select this node until the search is finished.
+ * @param loss Weight of the virtual loss
+ */
+void Node::addVirtualLoss(float loss) {
+  std::unique_lock<std::shared_mutex> lock(_valueMutex);
+  _virtualLoss += loss;
+}
+
+/**
+ * Removes a virtual loss added to the search node.
+ * @param loss Weight of the virtual loss
+ */
+void Node::removeVirtualLoss(float loss) {
+  std::unique_lock<std::shared_mutex> lock(_valueMutex);
+  _virtualLoss -= loss;
+}
+
 /**
  * Randomly obtains candidate moves based on the evaluation value of the PolicyNetwork.
  * @param temperature Temperature
@@ -479,7 +499,7 @@ float Node::getPriorityByPUCB(int32_t totalVisits) {
     return -99.0f;
   } else {
     float c_puct = std::log((1 + totalVisits + 19652.0) / 19652.0) + 1.25;
-    float value = (_value / _count) * _color;
+    float value = (_value * _color - _virtualLoss) / (_count + _virtualLoss);
     float upper = c_puct * _policy * std::sqrt(totalVisits) / (1 + _visits);
     return value + 2 * upper;
   }
@@ -495,7 +515,7 @@ float Node::getPriorityByUCB1(int32_t totalVisits) {
   if (_count == 0) {
     return -99.0f;
   } else {
-    float value = (_value / _count) * _color;
+    float value = (_value * _color - _virtualLoss) / (_count + _virtualLoss);
     float upper = 0.5 * std::sqrt(std::log(totalVisits) / (_visits + 1));
     return value + upper;
   }
@@ -576,6 +596,7 @@ void Node::_reset() {
   _playouts = 0;
   _value = 0.0f;
   _count = 0;
+  _virtualLoss = 0.0f;
 }
 
 /**
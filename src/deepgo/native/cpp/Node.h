@@ -62,6 +62,18 @@ class Node {
    */
   void cancelValue(float value);
 
+  /**
+   * Add a virtual loss to the search node while it is being searched.
+   * @param loss Weight of the virtual loss
+   */
+  void addVirtualLoss(float loss);
+
+  /**
+   * Remove a virtual loss added to the search node.
+   * @param loss Weight of the virtual loss
+   */
+  void removeVirtualLoss(float loss);
+
   /**
    * Get a candidate move randomly based on the PolicyNetwork evaluation value.
    * @param temperature Temperature
@@ -280,6 +292,11 @@ class Node {
    */
   int32_t _count;
 
+  /**
+   * Total weight of virtual losses added by searches in progress.
+   */
+  float _virtualLoss;
+
   /**
    * Execute the evaluation of this node.
    */
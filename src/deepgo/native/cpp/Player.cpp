@@ -20,11 +20,12 @@ namespace deepgo {
  * @param rule Game rule
  * @param superko True to apply the superko rule
  * @param evalLeafOnly True to evaluate only leaf nodes
+ * @param virtualLoss Weight of the virtual loss added to nodes being searched
  */
 Player::Player(
     Processor* processor, int32_t threads,
     int32_t width, int32_t height, float komi, int32_t rule, bool superko,
-    bool evalLeafOnly)
+    bool evalLeafOnly, float virtualLoss)
     : _mutex(),
       _condition(),
       _nodeManager(processor, width, height, komi, rule, superko),
@@ -32,6 +33,7 @@ Player::Player(
       _thread(),
       _root(_nodeManager.createNode()),
       _evalLeafOnly(evalLeafOnly),
+      _virtualLoss(virtualLoss),
       _searchVisits(0),
       _searchPlayouts(0),
       _searchEqually(false),
@@ -349,8 +351,13 @@ int32_t Player::_evaluate() {
     playouts += result.getPlayouts();
 
     // If a child node exists, set it as the next node
+    // (a virtual loss is added so that other threads search different nodes)
     if (result.getNode() != nullptr) {
       nodes.push_back(result.getNode());
+
+      if (_virtualLoss > 0.0f) {
+        result.getNode()->addVirtualLoss(_virtualLoss);
+      }
     } else {
       break;
     }
@@ -363,6 +370,13 @@ int32_t Player::_evaluate() {
     search_noise = 0.0f;
   }
 
+  // Remove the virtual losses added during this search
+  if (_virtualLoss > 0.0f) {
+    for (int32_t i = 1; i < nodes.size(); i++) {
+      nodes[i]->removeVirtualLoss(_virtualLoss);
+    }
+  }
+
   // Return the number of playouts
   return playouts;
 }
@@ -34,11 +34,12 @@ class Player {
    * @param rule Rule for determining the winner
    * @param superko True to apply the superko rule
    * @param evalLeafOnly True to evaluate only leaf nodes
+   * @param virtualLoss Weight of the virtual loss added to nodes being searched
    */
   Player(
       Processor* processor, int32_t threads,
       int32_t width, int32_t height, float komi, int32_t rule, bool superko,
-      bool evalLeafOnly);
+      bool evalLeafOnly, float virtualLoss);
 
   /**
    * Destroys the player object.
@@ -146,6 +147,11 @@ class Player {
    */
   bool _evalLeafOnly;
 
+  /**
+   * Weight of the virtual loss added to nodes being searched.
+   */
+  float _virtualLoss;
+
   /**
    * Number of visits to execute.
    */
@@ -17,12 +17,14 @@ class Processor {
    * @param gpus List of GPU numbers
    * @param batchSize Maximum batch size
    * @param fp16 True to compute with 16-bit precision
+   * @param bf16 True to compute with bfloat16 (on CUDA)
+   * @param optimize True to freeze the model and optimize it for inference
    * @param deterministic True to make computation results reproducible
    * @param threadsParGpu Number of threads per GPU
    */
   Processor(
       std::string model, std::vector<int32_t> gpus, int32_t batchSize,
-      bool fp16, bool deterministic, int32_t threadsParGpu);
+      bool fp16, bool bf16, bool optimize, bool deterministic, int32_t threadsParGpu);
 
   /**
    * Executes inference.
@@ -1,6 +1,6 @@
 from typing import List, Tuple
 
-from libc.stdint cimport int32_t
+from libc.stdint cimport int8_t, int32_t
 from libcpp cimport bool
 from libcpp.pair cimport pair
 from libcpp.vector cimport vector
@@ -20,13 +20,13 @@ cdef extern from "cpp/Board.h" namespace "deepgo":
         pair[int32_t, int32_t] getKo(int32_t)
         vector[pair[int32_t, int32_t]] getHistories(int32_t)
         int32_t getColor(int32_t, int32_t)
-        void getColors(int32_t*, int32_t)
+        void getColors(int8_t*, int32_t)
         int32_t getRenSize(int32_t, int32_t)
         int32_t getRenSpace(int32_t, int32_t)
         bool isShicho(int32_t, int32_t)
         bool isEnabled(int32_t, int32_t, int32_t, bool)
         void getEnableds(int32_t*, int32_t, bool)
-        void getTerritories(int32_t*, int32_t)
+        void getTerritories(int8_t*, int32_t)
         void getOwners(int32_t*, int32_t, int32_t)
         vector[int32_t] getPatterns()
         void getInputs(float*, int32_t, float, int32_t, bool)
@@ -112,10 +112,10 @@ cdef class NativeBoard:
         '''
         cdef width = self.board.getWidth()
         cdef height = self.board.getHeight()
-        cdef numpy.ndarray[numpy.int32_t, ndim=1, mode="c"] data = numpy.zeros(
-            (height * width,), dtype=numpy.int32)
+        cdef numpy.ndarray[numpy.int8_t, ndim=1, mode="c"] data = numpy.zeros(
+            (height * width,), dtype=numpy.int8)
 
-        self.board.getColors(<int32_t*> &data[0], color)
+        self.board.getColors(<int8_t*> &data[0], color)
 
         return data.reshape((height, width))
 
@@ -188,13 +188,30 @@ cdef class NativeBoard:
         '''
         cdef width = self.board.getWidth()
         cdef height = self.board.getHeight()
-        cdef numpy.ndarray[numpy.int32_t, ndim=1, mode="c"] data = numpy.zeros(
-            (height * width,), dtype=numpy.int32)
+        cdef numpy.ndarray[numpy.int8_t, ndim=1, mode="c"] data = numpy.zeros(
+            (height * width,), dtype=numpy.int8)
 
-        self.board.getTerritories(<int32_t*> &data[0], color)
+        self.board.getTerritories(<int8_t*> &data[0], color)
 
         return data.reshape((height, width))
 
+    def get_colors_and_territories(self, color: int) -> numpy.ndarray:
+        '''Get the color of all stones and the list of confirmed territories at once.
+        Args:
+            color (int): Reference stone color (specify WHITE to invert colors)
+        Returns:
+            numpy.ndarray: Stone colors and confirmed territories stacked in the first axis
+        '''
+        cdef width = self.board.getWidth()
+        cdef height = self.board.getHeight()
+        cdef numpy.ndarray[numpy.int8_t, ndim=1, mode="c"] data = numpy.empty(
+            (2 * height * width,), dtype=numpy.int8)
+
+        self.board.getColors(<int8_t*> &data[0], color)
+        self.board.getTerritories(<int8_t*> &data[height * width], color)
+
+        return data.reshape((2, height, width))
+
     def get_owners(self, color: int, rule: int) -> numpy.ndarray:
         '''Get the list of owners for each coordinate.
         Args:
@@ -219,18 +236,34 @@ cdef class NativeBoard:
         '''
         return self.board.getPatterns()
 
-    def get_inputs(self, color: int, komi: float, rule: int, superko: bool) -> numpy.ndarray:
+    def get_pattern_bytes(self) -> bytes:
+        '''Get values representing the arrangement of stones as bytes.
+        Returns:
+            bytes: Values representing the arrangement of stones
+        '''
+        cdef vector[int32_t] patterns = self.board.getPatterns()
+
+        return (<char*> patterns.data())[:patterns.size() * sizeof(int32_t)]
+
+    def get_inputs(
+            self, color: int, komi: float, rule: int, superko: bool,
+            out: numpy.ndarray | None = None) -> numpy.ndarray:
         '''Get board data to input to the inference model.
         Args:
             color (int): Stone color to play
             komi (float): Komi value
             rule (int): Rule for determining winner
             superko (bool): True to apply superko rule
+            out (numpy.ndarray | None): Array to store the board data
         Returns:
             numpy.ndarray: Board data
         '''
-        cdef numpy.ndarray[numpy.float32_t, ndim=1, mode="c"] inputs = numpy.zeros(
-            (MODEL_INPUT_SIZE,), dtype=numpy.float32)
+        if out is None:
+            out = numpy.empty((MODEL_INPUT_SIZE,), dtype=numpy.float32)
+        elif out.shape[0] != MODEL_INPUT_SIZE:
+            raise ValueError(f'Invalid input size: {out.shape[0]}')
+
+        cdef numpy.ndarray[numpy.float32_t, ndim=1, mode="c"] inputs = out
 
         self.board.getInputs(<float*> &inputs[0], color, komi, rule, superko)
 
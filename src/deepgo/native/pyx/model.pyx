@@ -10,7 +10,7 @@ from deepgo.config import MODEL_OUTPUT_SIZE
 
 cdef extern from "cpp/Model.h" namespace "deepgo":
     cdef cppclass Model:
-        Model(string, int32_t, bool, bool) except +
+        Model(string, int32_t, bool, bool, bool, bool) except +
         void forward(float*, float*, uint32_t)
         int32_t isCuda()
 
@@ -18,15 +18,26 @@ cdef extern from "cpp/Model.h" namespace "deepgo":
 cdef class NativeModel:
     cdef Model *model
 
-    def __cinit__(self, model: str, gpu: int, fp16: bool, deterministic: bool) -> None:
+    def __cinit__(
+        self,
+        model: str,
+        gpu: int,
+        fp16: bool,
+        bf16: bool,
+        optimize: bool,
+        deterministic: bool,
+    ) -> None:
         '''Create a model object.
         Args:
             model (str): Path to the model file
             gpu (int): GPU ID to use
             fp16 (bool): True to compute with FP16
+            bf16 (bool): True to compute with BF16 (on CUDA)
+            optimize (bool): True to freeze the model and optimize it for inference
             deterministic (bool): True to make computation results reproducible
         '''
-        self.model = new Model(model.encode('utf-8'), gpu, fp16, deterministic)
+        self.model = new Model(
+            model.encode('utf-8'), gpu, fp16, bf16, optimize, deterministic)
 
     def __dealloc__(self) -> None:
         del self.model
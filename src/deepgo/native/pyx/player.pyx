@@ -21,7 +21,7 @@ cdef extern from "cpp/Candidate.h" namespace "deepgo":
 
 cdef extern from "cpp/Player.h" namespace "deepgo":
     cdef cppclass Player:
-        Player(Processor*, int32_t, int32_t, int32_t, float, int, bool, bool) except +
+        Player(Processor*, int32_t, int32_t, int32_t, float, int, bool, bool, float) except +
         void initialize()
         int32_t play(int32_t, int32_t)
         vector[Candidate] getPass() nogil
@@ -44,7 +44,8 @@ cdef class NativePlayer:
         komi: float,
         rule: int,
         superko: bool,
-        eval_leaf_only: bool
+        eval_leaf_only: bool,
+        virtual_loss: float,
     )->None:
         '''Initialize player object.
         Args:
@@ -56,10 +57,11 @@ cdef class NativePlayer:
             rule (int): Rule for determining winner
             superko (bool): True to apply superko rule
             eval_leaf_only (bool): True to evaluate only leaf nodes
+            virtual_loss (float): Weight of the virtual loss added to nodes being searched
         '''
         self.player = new Player(
             processor.processor, threads,
-            width, height, komi, rule, superko, eval_leaf_only)
+            width, height, komi, rule, superko, eval_leaf_only, virtual_loss)
 
     def __dealloc__(self):
         del self.player
@@ -169,6 +171,46 @@ cdef class NativePlayer:
 
         return results
 
+    def get_candidate_arrays(
+        self,
+    ) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray,
+               numpy.ndarray, numpy.ndarray, List[List[Tuple[int, int]]]]:
+        '''Get the list of candidate moves as arrays of each field.
+        Returns:
+            Tuple[numpy.ndarray, ...]: Coordinates, colors, visits, playouts, policies, values
+                and the list of variations of candidates
+        '''
+        cdef vector[Candidate] candidates = self.player.getCandidates()
+        cdef int32_t size = candidates.size()
+        cdef int32_t i
+
+        cdef numpy.ndarray[numpy.int32_t, ndim=2, mode="c"] positions = numpy.empty(
+            (size, 2), dtype=numpy.int32)
+        cdef numpy.ndarray[numpy.int32_t, ndim=1, mode="c"] colors = numpy.empty(
+            (size,), dtype=numpy.int32)
+        cdef numpy.ndarray[numpy.int32_t, ndim=1, mode="c"] visits = numpy.empty(
+            (size,), dtype=numpy.int32)
+        cdef numpy.ndarray[numpy.int32_t, ndim=1, mode="c"] playouts = numpy.empty(
+            (size,), dtype=numpy.int32)
+        cdef numpy.ndarray[numpy.float32_t, ndim=1, mode="c"] policies = numpy.empty(
+            (size,), dtype=numpy.float32)
+        cdef numpy.ndarray[numpy.float32_t, ndim=1, mode="c"] values = numpy.empty(
+            (size,), dtype=numpy.float32)
+
+        variations = []
+
+        for i in range(size):
+            positions[i, 0] = candidates[i].getX()
+            positions[i, 1] = candidates[i].getY()
+            colors[i] = candidates[i].getColor()
+            visits[i] = candidates[i].getVisits()
+            playouts[i] = candidates[i].getPlayouts()
+            policies[i] = candidates[i].getPolicy()
+            values[i] = candidates[i].getValue()
+            variations.append(candidates[i].getVariations())
+
+        return positions, colors, visits, playouts, policies, values, variations
+
     def get_color(self) -> int:
         '''Get the color of the next stone to play.
         Returns:
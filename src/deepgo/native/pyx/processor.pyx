@@ -13,8 +13,8 @@ from deepgo.config import MODEL_OUTPUT_SIZE
 
 cdef extern from "cpp/Processor.h" namespace "deepgo":
     cdef cppclass Processor:
-        Processor(string, vector[int32_t], int32_t, bool, bool, int32_t) except +
-        void execute(float*, float*, int32_t)
+        Processor(string, vector[int32_t], int32_t, bool, bool, bool, bool, int32_t) except +
+        void execute(float*, float*, int32_t) nogil
 
 
 cdef class NativeProcessor:
@@ -26,6 +26,8 @@ cdef class NativeProcessor:
         gpus: List[int],
         batch_size: int,
         fp16: bool,
+        bf16: bool,
+        optimize: bool,
         deterministic: bool,
         threads_par_gpu: int,
     ) -> None:
@@ -35,12 +37,14 @@ cdef class NativeProcessor:
             gpus (List[int]): List of GPU IDs to use
             batch_size (int): Batch size
             fp16 (bool): True to compute with FP16
+            bf16 (bool): True to compute with BF16 (on CUDA)
+            optimize (bool): True to freeze the model and optimize it for inference
             deterministic (bool): True to make results reproducible
             threads_par_gpu (int): Number of threads per GPU
         '''
         self.processor = new Processor(
             model.encode('utf-8'), gpus,
-            batch_size, fp16, deterministic, threads_par_gpu)
+            batch_size, fp16, bf16, optimize, deterministic, threads_par_gpu)
 
     def __dealloc__(self) -> None:
         del self.processor
@@ -55,10 +59,15 @@ cdef class NativeProcessor:
         cdef numpy.ndarray[numpy.float32_t, ndim=2, mode="c"] outputs = numpy.zeros(
             (inputs.shape[0], MODEL_OUTPUT_SIZE), dtype=numpy.float32)
 
-        cdef int size = inputs.shape[0]
-        cdef float* in_data = <float*> inputs.data
+        cdef numpy.ndarray[numpy.float32_t, ndim=2, mode="c"] in_array = numpy.ascontiguousarray(
+            inputs, dtype=numpy.float32)
+
+        cdef int size = in_array.shape[0]
+        cdef float* in_data = <float*> in_array.data
         cdef float* out_data = <float*> outputs.data
 
-        self.processor.execute(in_data, out_data, size)
+        # Release the GIL so that requests from other threads are batched together
+        with nogil:
+            self.processor.execute(in_data, out_data, size)
 
         return outputs
@@ -1,67 +1,89 @@
+import hashlib
 import logging
-from typing import List, Set, Tuple
+from typing import Dict, List, Set, Tuple
 
 import numpy as np
 
-from .board import (Board, get_color_name, get_handicap_positions,
-                    get_opposite_color, is_valid_position)
-from .config import (BLACK, DEFAULT_KOMI, DEFAULT_SIZE, EMPTY, MODEL_SIZE,
-                     PASS, RULE_CH, RULE_COM, RULE_JP, WHITE)
+from .board import Board, get_color_name, get_handicap_positions, get_opposite_color
+from .config import (BLACK, DEFAULT_KOMI, DEFAULT_SIZE, EMPTY, MODEL_SIZE, PASS,
+                     RULE_CH, RULE_COM, RULE_JP, WHITE)
 from .native import NativePlayer
 from .processor import Processor
 
 LOGGER = logging.getLogger(__name__)
 
 
-def get_area_color(
-    territories: np.ndarray,
-    position: Tuple[int, int],
-) -> Tuple[int, List[Tuple[int, int]]]:
-    '''Get the color of an area.
+def fill_single_color_areas(territories: np.ndarray) -> np.ndarray:
+    '''Fill empty areas surrounded by a single color with that color.
     Args:
         territories (np.ndarray): Area data
-        position (Tuple[int, int]): Position to check
     Returns:
-        Tuple[int, List[Tuple[int, int]]]: Area color and list of positions
+        np.ndarray: Area data in which surrounded empty areas are filled
     '''
-    if territories[position] != EMPTY:
-        return territories[position], []
-
-    # Perform depth-first search to get area color
-    stack = [position]
-    checked: Set[Tuple[int, int]] = set()
-    positions: List[Tuple[int, int]] = []
-    color = EMPTY
-    single = True
-
-    while len(stack) > 0:
-        y, x = stack.pop()
-        positions.append((y, x))
-
-        for pos in ((y - 1, x), (y + 1, x), (y, x - 1), (y, x + 1)):
-            if pos in checked:
-                continue
+    height, width = territories.shape
+    size = height * width
+    empties = territories == EMPTY
 
-            checked.add(pos)
+    # Label connected empty areas with the minimum position number in each area
+    # (labels are also positions, so following the label of a label skips ahead
+    #  along long areas and reduces the number of iterations)
+    labels = np.where(empties, np.arange(size).reshape(height, width), size)
+    parents = np.append(labels.ravel(), size)
 
-            if not is_valid_position(pos, territories.shape[1], territories.shape[0]):
-                continue
-            elif territories[pos] == EMPTY:
-                stack.append(pos)
-            elif color == EMPTY or territories[pos] == color:
-                color = territories[pos]
-            else:
-                single = False
+    while True:
+        new_labels = labels.copy()
+        np.minimum(new_labels[1:, :], labels[:-1, :], out=new_labels[1:, :])
+        np.minimum(new_labels[:-1, :], labels[1:, :], out=new_labels[:-1, :])
+        np.minimum(new_labels[:, 1:], labels[:, :-1], out=new_labels[:, 1:])
+        np.minimum(new_labels[:, :-1], labels[:, 1:], out=new_labels[:, :-1])
+        new_labels[~empties] = size
+
+        parents[:size] = new_labels.ravel()
+        new_labels = parents[parents[new_labels]]
+
+        if (new_labels == labels).all():
+            break
+
+        labels = new_labels
+
+    # Find the areas adjacent to the stones of each color
+    def get_adjacent_labels(mask: np.ndarray) -> np.ndarray:
+        adjacents = np.zeros_like(mask)
+        adjacents[1:, :] |= mask[:-1, :]
+        adjacents[:-1, :] |= mask[1:, :]
+        adjacents[:, 1:] |= mask[:, :-1]
+        adjacents[:, :-1] |= mask[:, 1:]
+        return np.bincount(labels[adjacents & empties], minlength=size) != 0
+
+    blacks = get_adjacent_labels(territories == BLACK)
+    whites = get_adjacent_labels(territories == WHITE)
+
+    # Set the color of each area (empty if adjacent to both colors or neither)
+    colors = np.full(size, EMPTY, dtype=territories.dtype)
+    colors[blacks & ~whites] = BLACK
+    colors[whites & ~blacks] = WHITE
 
-    # If the area color is single, return that color and list of positions
-    if single:
-        return color, positions
-    # If the area color is not single, return empty color and list of positions
-    else:
-        return EMPTY, positions
+    result = territories.copy()
+    result[empties] = colors[labels[empties]]
+
+    return result
+
+
+def get_board_key(board: Board) -> bytes:
+    '''Get the key representing the arrangement of stones.
+    Args:
+        board (Board): Board data
+    Returns:
+        bytes: Key of the board
+    '''
+    return hashlib.blake2b(board.get_pattern_bytes(), digest_size=16).digest()
 
 
 class Candidate(object):
+    __slots__ = (
+        'pos', 'color', 'visits', 'playouts', 'policy', 'value', 'variations',
+        'win_chance', 'win_chance_lcb')
+
     def __init__(
         self,
         pos: Tuple[int, int],
@@ -71,6 +93,8 @@ class Candidate(object):
         policy: float,
         value: float,
         variations: List[Tuple[int, int]],
+        win_chance: float | None = None,
+        win_chance_lcb: float | None = None,
     ) -> None:
         '''Initialize candidate move object.
         Args:
@@ -81,7 +105,15 @@ class Candidate(object):
             policy (float): Predicted move probability
             value (float): Predicted win rate
             variations (List[Tuple[int, int]]): Predicted sequence
+            win_chance (float | None): Win chance (calculated from value if None)
+            win_chance_lcb (float | None): Lower confidence bound of win chance (calculated if None)
         '''
+        if win_chance is None:
+            win_chance = value * color * 0.5 + 0.5
+
+        if win_chance_lcb is None:
+            win_chance_lcb = win_chance - 1.96 * 0.25 / (visits + 1)**0.5
+
         self.pos = pos
         self.color = color
         self.visits = visits
@@ -89,8 +121,8 @@ class Candidate(object):
         self.policy = policy
         self.value = value
         self.variations = variations
-        self.win_chance = value * color * 0.5 + 0.5
-        self.win_chance_lcb = self.win_chance - 1.96 * 0.25 / (visits + 1)**0.5
+        self.win_chance = win_chance
+        self.win_chance_lcb = win_chance_lcb
 
     def __str__(self) -> str:
         return (
@@ -103,6 +135,45 @@ class Candidate(object):
         return str(self)
 
 
+def create_candidates(
+    arrays: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray,
+                  np.ndarray, np.ndarray, List[List[Tuple[int, int]]]],
+    criterion: str = 'lcb',
+) -> List[Candidate]:
+    '''Create candidate move objects from the arrays returned by the native player.
+    Win chances and sort keys of all candidates are calculated at once.
+    Args:
+        arrays (Tuple[np.ndarray, ...]): Coordinates, colors, visits, playouts, policies, values
+            and the list of variations of candidates
+        criterion (str): Candidate priority criterion ('lcb' or 'visits')
+    Returns:
+        List[Candidate]: List of candidate moves sorted by the criterion
+    '''
+    if criterion not in ('lcb', 'visits'):
+        raise ValueError(f'Unknown criterion: {criterion}')
+
+    positions, colors, visits, playouts, policies, values, variations = arrays
+
+    if len(variations) == 0:
+        return []
+
+    win_chances = values.astype(np.float64) * colors * 0.5 + 0.5
+    win_chance_lcbs = win_chances - 1.96 * 0.25 / np.sqrt(visits + 1.0)
+
+    # Sort candidates in descending order of the criterion
+    keys = visits if criterion == 'visits' else win_chance_lcbs
+    orders = np.argsort(-keys, kind='stable')
+
+    # Convert values to Python objects in sorted order
+    fields = zip(
+        positions[orders].tolist(), colors[orders].tolist(), visits[orders].tolist(),
+        playouts[orders].tolist(), policies[orders].tolist(), values[orders].tolist(),
+        [variations[i] for i in orders.tolist()],
+        win_chances[orders].tolist(), win_chance_lcbs[orders].tolist())
+
+    return [Candidate(tuple(pos), *others) for pos, *others in fields]
+
+
 class Player(object):
     def __init__(
         self,
@@ -114,6 +185,7 @@ class Player(object):
         rule: int = RULE_CH,
         superko: bool = False,
         eval_leaf_only: bool = False,
+        virtual_loss: float = 0.0,
     ) -> None:
         '''Initialize player object.
         Args:
@@ -125,11 +197,12 @@ class Player(object):
             rule (int): Rule for determining winner
             superko (bool): True to apply superko rule
             eval_leaf_only (bool): True to evaluate only leaf nodes
+            virtual_loss (float): Weight of the virtual loss added to nodes being searched
         '''
         self.native = NativePlayer(
             processor=processor.native, threads=threads,
             width=width, height=height, komi=komi, rule=rule, superko=superko,
-            eval_leaf_only=eval_leaf_only)
+            eval_leaf_only=eval_leaf_only, virtual_loss=virtual_loss)
         self.processor = processor
         self.width = width
         self.height = height
@@ -140,7 +213,18 @@ class Player(object):
         self.value = 0.0
         self.moves = [0, 0]
         self.captureds = [0, 0]
-        self.histories: Set[Tuple] = set()
+        self.histories: Set[bytes] = set()
+        self.predictions: Dict[Tuple, Tuple[Board, np.ndarray]] = {}
+        self.board: Board | None = None
+        self.trial_board = Board(width, height)
+
+        # Regions of the board in the model output
+        model_length = MODEL_SIZE * MODEL_SIZE
+        begin_x = (MODEL_SIZE - width) // 2
+        begin_y = (MODEL_SIZE - height) // 2
+        self.territory_slice = slice(2 * model_length, 5 * model_length)
+        self.value_slice = slice(5 * model_length, 6 * model_length)
+        self.board_region = np.s_[..., begin_y:begin_y + height, begin_x:begin_x + width]
 
     def initialize(self) -> None:
         '''Initialize the board.'''
@@ -149,6 +233,8 @@ class Player(object):
         self.value = 0.0
         self.moves = [0, 0]
         self.captureds = [0, 0]
+        self.predictions.clear()
+        self.board = None
 
     def set_handicap(self, handicap: int) -> None:
         '''Set handicap stones.
@@ -162,6 +248,9 @@ class Player(object):
             self.native.play(pos)
             self.moves[0] += 1
 
+        self.predictions.clear()
+        self.board = None
+
     def is_valid_position(self, pos: Tuple[int, int]) -> bool:
         '''Return whether the specified coordinates are valid.
         Args:
@@ -169,7 +258,7 @@ class Player(object):
         Returns:
             bool: True if valid coordinates
         '''
-        return is_valid_position(pos, self.width, self.height)
+        return 0 <= pos[0] < self.width and 0 <= pos[1] < self.height
 
     def is_superko_move(self, pos: Tuple[int, int], color: int) -> bool:
         '''Determine whether the specified coordinates are a superko move.
@@ -182,10 +271,11 @@ class Player(object):
         if not self.is_valid_position(pos):
             return False
 
-        board = self.get_board()
-        board.play(pos, color)
+        # Play the move on the reusable trial board instead of creating a new board
+        self.trial_board.copy_from(self.get_board(copy=False))
+        self.trial_board.play(pos, color)
 
-        return tuple(board.get_patterns()) in self.histories
+        return get_board_key(self.trial_board) in self.histories
 
     def get_cleanup_position(self, color: int) -> Tuple[int, int]:
         '''Return the coordinates to remove dead stones.
@@ -194,25 +284,27 @@ class Player(object):
         Returns:
             Tuple[int, int]: Coordinates
         '''
-        board = self.get_board()
-        colors = board.get_colors(color)
-        territories = board.get_territories(color)
-        enableds = board.get_enableds(color)
+        board = self.get_board(copy=False)
+        colors, territories = board.get_colors_and_territories(color)
 
-        deads = ((territories == BLACK) & (colors == WHITE)).astype(np.int32)
+        # Mark positions adjacent to dead stones
+        deads = (territories == BLACK) & (colors == WHITE)
         targets = np.zeros_like(deads)
-        targets[1:, :] += deads[:-1, :]
-        targets[:-1, :] += deads[1:, :]
-        targets[:, 1:] += deads[:, :-1]
-        targets[:, :-1] += deads[:, 1:]
+        targets[1:, :] |= deads[:-1, :]
+        targets[:-1, :] |= deads[1:, :]
+        targets[:, 1:] |= deads[:, :-1]
+        targets[:, :-1] |= deads[:, 1:]
 
-        positions = (targets != 0) & enableds
-        ys, xs = np.where(positions)
-
-        if len(xs) == 0:
+        if not targets.any():
             return PASS
 
-        return xs[0], ys[0]
+        # Return the first position where a stone can be placed
+        # (legality is checked only for positions adjacent to dead stones)
+        for y, x in zip(*np.nonzero(targets)):
+            if board.is_enabled((int(x), int(y)), color):
+                return int(x), int(y)
+
+        return PASS
 
     def play(self, pos: Tuple[int, int], color: int | None = None) -> int:
         '''Place a stone.
@@ -244,8 +336,13 @@ class Player(object):
             self.moves[1] += move_count
             self.captureds[0] += captured
 
-        # Register the board state in the history
-        self.histories.add(tuple(self.get_board().get_patterns()))
+        # Discard data of the previous board
+        self.predictions.clear()
+        self.board = None
+
+        # Register the board state in the history (only needed for superko rule)
+        if self.superko:
+            self.histories.add(get_board_key(self.get_board(copy=False)))
 
         return captured
 
@@ -275,7 +372,8 @@ class Player(object):
             candidate = Candidate(*self.native.get_random(temperature))
 
             # Output log
-            LOGGER.debug(candidate)
+            if LOGGER.isEnabledFor(logging.DEBUG):
+                LOGGER.debug(candidate)
 
             # If the move is valid, exit the loop
             if not self.is_valid_position(candidate.pos):
@@ -326,8 +424,9 @@ class Player(object):
         self.native.start_evaluation(equally, use_ucb1, width, temperature, noise)
         self.native.wait_evaluation(visits, playouts, timelimit, not ponder)
 
-        # Create a list of candidate moves
-        candidates = [Candidate(*c) for c in self.native.get_candidates()]
+        # Create a list of candidate moves sorted by the criterion
+        # (removing candidates and replacing coordinates below keep the order)
+        candidates = create_candidates(self.native.get_candidate_arrays(), criterion)
 
         # Remove candidates that are superko moves
         if self.superko:
@@ -345,14 +444,6 @@ class Player(object):
                 if not self.is_valid_position(candidates[i].pos):
                     candidates[i].pos = self.get_cleanup_position(candidates[i].color)
 
-        # Sort candidates
-        if criterion == 'visits':
-            candidates.sort(key=lambda cand: cand.visits, reverse=True)
-        elif criterion == 'lcb':
-            candidates.sort(key=lambda cand: cand.win_chance_lcb, reverse=True)
-        else:
-            raise ValueError(f'Unknown criterion: {criterion}')
-
         # Output log
         if LOGGER.isEnabledFor(logging.DEBUG):
             LOGGER.debug(
@@ -385,36 +476,19 @@ class Player(object):
         Returns:
             np.ndarray: Predicted territory
         '''
-        # Get board data
-        board = self.get_board()
-
         # Get the next move color
         if color is None:
             color = self.get_color()
 
-        # If a move coordinate is specified,
-        # return the territory after placing a stone at that coordinate
+        # Execute territory evaluation
+        # (if a move coordinate is specified, evaluate the board after the move)
+        board, y = self._predict(pos, color)
+
         if pos is not None:
-            board.play(pos, color)
             color = get_opposite_color(color)
 
-        # Create input values
-        x = board.get_inputs(color, self.komi, self.rule, self.superko)
-        x = x.reshape(1, -1)
-
-        # Execute territory evaluation
-        y = self.processor.execute(x)
-
         # Format output values
-        model_length = MODEL_SIZE * MODEL_SIZE
-        begin_x = (MODEL_SIZE - self.width) // 2
-        end_x = begin_x + self.width
-        begin_y = (MODEL_SIZE - self.height) // 2
-        end_y = begin_y + self.height
-
-        t = y[0, 2 * model_length:5 * model_length]
-        t = t.reshape(3, MODEL_SIZE, MODEL_SIZE)
-        t = t[:, begin_y:end_y, begin_x:end_x]
+        t = y[self.territory_slice].reshape(3, MODEL_SIZE, MODEL_SIZE)[self.board_region]
 
         # Reverse colors for white's turn
         if color != BLACK:
@@ -422,46 +496,61 @@ class Player(object):
 
         # Reflect already determined territory data
         territories = board.get_territories()
-        black_territories = (territories == BLACK).astype(np.float32)
-        white_territories = (territories == WHITE).astype(np.float32)
-        empty_territories = (territories == EMPTY).astype(np.float32)
-
-        t = t * np.expand_dims(empty_territories, 0)
-        t[0] += white_territories
-        t[2] += black_territories
+        determined = territories != EMPTY
 
         if raw:
+            t = np.where(determined, np.float32(0.0), t)
+            t[0, territories == WHITE] = 1.0
+            t[2, territories == BLACK] = 1.0
             return t
         else:
-            return t.argmax(axis=0) - 1
+            result = (t.argmax(axis=0) - 1).astype(np.int8)
+            result[determined] = territories[determined]
+            return result
 
     def get_values(self) -> np.ndarray:
         '''Get the board evaluation values.
         Returns:
             np.ndarray: Board evaluation values
         '''
-        board = self.get_board()
-
-        # Create input values
-        x = board.get_inputs(BLACK, self.komi, self.rule, self.superko)
-        x = x.reshape(1, -1)
-
         # Get evaluation values
-        y = self.processor.execute(x)
+        _, y = self._predict(None, BLACK)
 
         # Format output values
-        model_length = MODEL_SIZE * MODEL_SIZE
-        begin_x = (MODEL_SIZE - self.width) // 2
-        end_x = begin_x + self.width
-        begin_y = (MODEL_SIZE - self.height) // 2
-        end_y = begin_y + self.height
-
-        v = y[0, 5 * model_length:6 * model_length]
-        v = v.reshape(MODEL_SIZE, MODEL_SIZE)
-        v = v[begin_y:end_y, begin_x:end_x] * 2.0 - 1.0
+        v = y[self.value_slice].reshape(MODEL_SIZE, MODEL_SIZE)[self.board_region] * 2.0 - 1.0
 
         return v
 
+    def _predict(
+        self,
+        pos: Tuple[int, int] | None,
+        color: int,
+    ) -> Tuple[Board, np.ndarray]:
+        '''Return the board and the model output for the current board.
+        If a move coordinate is specified, the board after the move is evaluated.
+        Results are reused until the board is changed.
+        Args:
+            pos (Tuple[int, int] | None): Move coordinate
+            color (int): Move color
+        Returns:
+            Tuple[Board, np.ndarray]: Evaluated board and model output
+        '''
+        key = (pos, color, self.komi)
+
+        if key not in self.predictions:
+            board = self.get_board()
+
+            if pos is not None:
+                board.play(pos, color)
+                color = get_opposite_color(color)
+
+            x = board.get_inputs(color, self.komi, self.rule, self.superko)
+            x = x.reshape(1, -1)
+
+            self.predictions[key] = (board, self.processor.execute(x)[0])
+
+        return self.predictions[key]
+
     def get_color(self) -> int:
         '''Return the color of the next stone to be placed.
         Returns:
@@ -469,14 +558,20 @@ class Player(object):
         '''
         return self.native.get_color()
 
-    def get_board(self) -> Board:
+    def get_board(self, copy: bool = True) -> Board:
         '''Return board data.
+        If `copy` is False, the cached board is returned and must not be modified.
+        Args:
+            copy (bool): True to return a copy that can be modified
         Returns:
             Board: Board data
         '''
-        board = Board(self.width, self.height)
-        board.load_state(self.native.get_board_state())
-        return board
+        # Restore the board from the native state only once after the board is changed
+        if self.board is None:
+            self.board = Board(self.width, self.height)
+            self.board.load_state(self.native.get_board_state())
+
+        return self.board.copy() if copy else self.board
 
     def get_board_state(self) -> List[int]:
         '''Get the board state.
@@ -499,34 +594,28 @@ class Player(object):
         else:
             return 0
 
-    def get_final_score(self) -> float:
+    def get_final_score(self, territories: np.ndarray | None = None) -> float:
         '''Get the final score.
+        Args:
+            territories (np.ndarray | None): Predicted territory (predicted from the board if None)
         Returns:
             float: Score
         '''
         # Get stone colors and territory prediction
-        colors = self.get_board().get_colors()
-        territories = self.get_territories()
+        colors = self.get_board(copy=False).get_colors()
 
-        # Reflect seki
-        territories += (territories == 0).astype(np.int32) * colors
+        if territories is None:
+            territories = self.get_territories()
+
+        # Reflect seki (creates a new array, so the given territory is left unchanged)
+        territories = np.where(territories == EMPTY, colors, territories)
 
         # For Chinese rules, replace surrounded empty points with the surrounding color
         if self.rule == RULE_CH:
-            checked_positions = np.zeros_like(territories, dtype=np.bool_)
-
-            for y, x in np.ndindex(territories.shape):
-                if checked_positions[y, x] or territories[y, x] != EMPTY:
-                    continue
-
-                color, positions = get_area_color(territories, (y, x))
-
-                for pos in positions:
-                    territories[pos] = color
-                    checked_positions[pos] = True
+            territories = fill_single_color_areas(territories)
 
         # Calculate the score
-        result = float(territories.sum()) - self.komi
+        result = float(territories.sum(dtype=np.int32)) - self.komi
 
         if self.rule == RULE_JP:
             result -= self.moves[0] - self.moves[1]
@@ -13,6 +13,8 @@ class Processor(object):
         gpus: List[int] = [-1],
         batch_size: int = 2048,
         fp16: bool = False,
+        bf16: bool = False,
+        optimize: bool = False,
         deterministic: bool = False,
         threads_par_gpu: int = 1,
     ) -> None:
@@ -22,6 +24,8 @@ class Processor(object):
             gpus (List[int]): List of GPU numbers to use
             batch_size (int): Maximum batch size
             fp16 (bool): True to use FP16
+            bf16 (bool): True to use BF16 instead of FP16 (on CUDA)
+            optimize (bool): True to freeze the model and optimize it for inference
             deterministic (bool): True to make results reproducible
             threads_par_gpu (int): Number of threads per GPU
         '''
@@ -29,11 +33,15 @@ class Processor(object):
             raise FileNotFoundError(f'File not found: {model}')
 
         self.native = NativeProcessor(
-            str(model), gpus, batch_size, fp16, deterministic, threads_par_gpu)
+            str(model), gpus, batch_size, fp16, bf16, optimize, deterministic, threads_par_gpu)
 
     def execute(self, inputs: np.ndarray) -> np.ndarray:
         '''Execute inference.
+        This method can be called from multiple threads,
+        and concurrent requests are combined into batches by the native executors.
         Args:
             inputs (np.ndarray): Input data
+        Returns:
+            np.ndarray: Output data
         '''
         return self.native.execute(inputs)
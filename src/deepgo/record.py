@@ -1,14 +1,23 @@
-import struct
+import re
 from io import IOBase, TextIOBase
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+import numpy as np
+
 from .board import Board, get_color_mark, is_valid_position
 from .config import BLACK, DEFAULT_SIZE, PASS, WHITE
 from .exception import GoException
 
 CHARSETS = ('utf-8', 'shift-jis', 'euc-jp', 'iso-2022-jp')
 
+# Tokens of game record text: node start, end of game tree, and property
+TOKEN_PATTERN = re.compile(r'(;)|(\))|([^;\[\)]*)\[((?:\\.|[^\\\]])*)\]', re.DOTALL)
+ESCAPE_PATTERN = re.compile(r'\\(.)', re.DOTALL)
+
+# Characters representing coordinates in game record text
+COORDINATES = tuple(chr(97 + i) for i in range(52))
+
 
 def _read_text(file: str | Path | IOBase) -> str:
     if isinstance(file, IOBase):
@@ -19,56 +28,32 @@ def _read_text(file: str | Path | IOBase) -> str:
     if isinstance(binary, str):
         return binary
 
-    text = None
-
-    for charset in CHARSETS:
+    # Return the text decoded with the last charset that succeeds
+    # (ISO-2022-JP and EUC-JP text can also be decoded as UTF-8 or Shift_JIS)
+    for charset in reversed(CHARSETS):
         try:
-            text = binary.decode(charset)
-        except BaseException:
+            return binary.decode(charset)
+        except UnicodeDecodeError:
             pass
 
-    if text is None:
-        raise GoException('unsupported charset')
-
-    return text
+    raise GoException('unsupported charset')
 
 
 def _parse_text(text: str) -> List[Dict[str, str]]:
     values_list: List[Dict[str, str]] = []
-    index = 0
-    state = 0
-    name = ''
-    value = ''
-    escape = False
-
-    while index < len(text) and state == 0:
-        if text[index] == '(':
-            state = 1
-        index += 1
-
-    while state > 0:
-        if state == 1 and text[index] == ')':
-            state = 0
-        elif state == 1 and text[index] == ';':
+    index = text.find('(')
+
+    if index < 0:
+        return values_list
+
+    for match in TOKEN_PATTERN.finditer(text, index + 1):
+        if match.group(1) is not None:
             values_list.append({})
-            name = ''
-            value = ''
-        elif state == 1 and text[index] == '[':
-            state = 2
-        elif state == 1 and not text[index].isspace():
-            name += text[index]
-        elif state == 2 and not escape and text[index] == ']':
-            values_list[-1][name.lower()] = value
-            name = ''
-            value = ''
-            state = 1
-        elif state == 2 and not escape and text[index] == '\\':
-            escape = True
-        elif state == 2:
-            value += text[index]
-            escape = False
-
-        index += 1
+        elif match.group(2) is not None:
+            break
+        else:
+            name = ''.join(match.group(3).split()).lower()
+            values_list[-1][name] = ESCAPE_PATTERN.sub(r'\1', match.group(4))
 
     return values_list
 
@@ -78,10 +63,17 @@ def _escape_value(value: str) -> str:
 
 
 class Properties(dict[str, str]):
+    # Keys are stored in lowercase, so lookups try the given key as is before lowercasing it
     def get(self, key: str, default: str = '') -> str:  # type: ignore
-        return self[key.lower()] if key.lower() in self else default
+        if super().__contains__(key):
+            return super().__getitem__(key)
+
+        return super().get(key.lower(), default)
 
     def __getitem__(self, key: str) -> str:
+        if super().__contains__(key):
+            return super().__getitem__(key)
+
         return super().__getitem__(key.lower())
 
     def __setitem__(self, key: str, value: str) -> None:
@@ -91,11 +83,10 @@ class Properties(dict[str, str]):
         return super().__delitem__(str(key).lower())
 
     def __contains__(self, key: object) -> bool:
-        return super().__contains__(str(key).lower())
+        return super().__contains__(key) or super().__contains__(str(key).lower())
 
     def update(self, values: Dict[str, str]) -> None:  # type: ignore
-        for k, v in values.items():
-            self[k] = v
+        super().update((k.lower(), v) for k, v in values.items())
 
 
 class Record(object):
@@ -127,30 +118,33 @@ class Record(object):
         if 'sz' not in self.properties:
             self.properties['sz'] = str(DEFAULT_SIZE)
 
+        colors: List[int] = []
+        coords: List[str] = []
+        messages: List[str | None] = []
+
         for v in values[1:]:
             if 'b' in v:
-                color = BLACK
+                colors.append(BLACK)
                 coord = v['b']
             elif 'w' in v:
-                color = WHITE
+                colors.append(WHITE)
                 coord = v['w']
             else:
                 continue
 
-            if len(coord) == 2:
-                pos = (ord(coord[0]) - 97, ord(coord[1]) - 97)
-            else:
-                pos = PASS
-
-            if not is_valid_position(pos, self.size, self.size):
-                pos = PASS
+            # Coordinates other than two characters are replaced with an invalid one
+            coords.append(coord if len(coord) == 2 else '\0\0')
+            messages.append(v['c'] if 'c' in v else None)
 
-            if 'c' in v:
-                message = v['c']
-            else:
-                message = None
+        # Convert all coordinates at once (invalid coordinates are treated as passes)
+        size = self.size
+        codes = np.frombuffer(''.join(coords).encode('utf-32-le'), dtype=np.uint32)
+        positions = codes.astype(np.int64).reshape(-1, 2) - 97
+        valids = ((positions >= 0) & (positions < size)).all(axis=1)
 
-            self.moves.append((pos, color, message))
+        for (x, y), valid, color, message in zip(
+                positions.tolist(), valids.tolist(), colors, messages):
+            self.moves.append(((x, y) if valid else PASS, color, message))
 
     def dump(self, file: str | Path | IOBase) -> None:
         '''Write data to game record file.
@@ -175,25 +169,26 @@ class Record(object):
         props['ff'] = '4'
         props['sz'] = str(self.size)
 
-        props_text = ''.join(f'{k.upper()}[{v}]' for k, v in sorted(props.items()))
-        text = f'(;{props_text}'
+        size = self.size
+        texts = ['(;']
+        texts.extend(f'{k.upper()}[{v}]' for k, v in sorted(props.items()))
 
         for pos, color, message in self.moves:
             c = 'B' if color == BLACK else 'W'
 
-            if is_valid_position(pos, self.size, self.size):
-                p = struct.pack('BB', 97 + pos[0], 97 + pos[1]).decode('utf-8')
+            if is_valid_position(pos, size, size):
+                p = COORDINATES[pos[0]] + COORDINATES[pos[1]]
             else:
                 p = ''
 
-            text += f';{c}[{p}]'
+            texts.append(f';{c}[{p}]')
 
             if message is not None:
-                text += f'C[{_escape_value(message)}]'
+                texts.append(f'C[{_escape_value(message)}]')
 
-        text += ')'
+        texts.append(')')
 
-        return text
+        return ''.join(texts)
 
     def create_board(self) -> Board:
         '''Create board object.
@@ -1,13 +1,15 @@
 import argparse
+import json
+import os
 import sys
+from pathlib import Path
 
-import torch
-from deepgo.config import (DEFAULT_KOMI, DEFAULT_SIZE, NAME, RULE_CH, RULE_COM,
-                           RULE_JP, VERSION)
-from deepgo.gpu import get_default_gpus
-from deepgo.gtp import GTPEngine
+from deepgo.config import (DEFAULT_BATCH_SIZE, DEFAULT_KOMI, DEFAULT_SIZE, NAME,
+                           RULE_CH, RULE_COM, RULE_JP, VERSION)
 from deepgo.log import start_logging
-from deepgo.processor import Processor
+
+# Game rules specified by the command line option
+RULES = {'ch': RULE_CH, 'jp': RULE_JP, 'com': RULE_COM}
 
 
 def parse_args() -> argparse.Namespace:
@@ -29,19 +31,23 @@ def parse_args() -> argparse.Namespace:
         '--criterion', type=str, default='lcb', choices=['lcb', 'visits'],
         help='Criterion for candidate prioritization (default: lcb)')
     parser.add_argument(
-        '--rule', type=str, default='ch', choices=['ch', 'jp', 'com'], help='Rule (default: ch)')
+        '--rule', type=str, default='ch', choices=list(RULES), help='Rule (default: ch)')
     parser.add_argument(
         '--boardsize', type=int, default=DEFAULT_SIZE, help=f'Board size (default: {DEFAULT_SIZE})')
     parser.add_argument(
         '--komi', type=float, default=DEFAULT_KOMI, help=f'Komi (default: {DEFAULT_KOMI})')
     parser.add_argument(
-        '--superko', default=False, action='store_true', help='Use superko rule')
+        '--superko', default=False, action=argparse.BooleanOptionalAction, help='Use superko rule')
+    parser.add_argument(
+        '--eval-leaf-only', default=False, action=argparse.BooleanOptionalAction,
+        help='Evaluate leaf nodes only')
     parser.add_argument(
-        '--eval-leaf-only', default=False, action='store_true', help='Evaluate leaf nodes only')
+        '--virtual-loss', type=float, default=0.0,
+        help='Weight of virtual loss for parallel search (default: 0.0)')
     parser.add_argument(
         '--timelimit', type=float, default=120, help='Timelimit (sec) (default: 120 sec)')
     parser.add_argument(
-        '--ponder', default=False, action='store_true', help='Use pondering')
+        '--ponder', default=False, action=argparse.BooleanOptionalAction, help='Use pondering')
     parser.add_argument(
         '--resign', type=float, default=0.02, help='Resign threshold (default: 0.02)')
     parser.add_argument(
@@ -56,50 +62,144 @@ def parse_args() -> argparse.Namespace:
         '--client-version', type=str, default=VERSION, help=f'Client version (default: {VERSION})')
     parser.add_argument(
         '--threads', type=int, default=16, help='Number of threads (default: 16)')
+    parser.add_argument(
+        '--torch-threads', type=int, default=None,
+        help='Number of threads for PyTorch operations (default: auto)')
     parser.add_argument(
         '--display', type=str, default=None, help='Command to display board (default: None)')
     parser.add_argument(
         '--sgf', type=str, default=None, help='SGF file to load (default: None)')
     parser.add_argument(
-        '--batch-size', type=int, default=2048, help='Batch size (default: 2048)')
+        '--batch-size', type=int, default=None,
+        help=f'Batch size (default: tuned for CUDA GPUs, otherwise {DEFAULT_BATCH_SIZE})')
     parser.add_argument(
         '--gpus', type=lambda x: list(map(int, x.split(','))), default=None,
         help='GPU IDs (comma-separated) (default: all available GPUs)')
     parser.add_argument(
-        '--fp16', default=False, action='store_true', help='Use FP16')
+        '--streams', type=int, default=1,
+        help='Number of inference streams per GPU (default: 1)')
+    precision = parser.add_mutually_exclusive_group()
+    precision.add_argument(
+        '--fp16', default=False, action=argparse.BooleanOptionalAction, help='Use FP16')
+    precision.add_argument(
+        '--bf16', default=False, action=argparse.BooleanOptionalAction, help='Use BF16 on CUDA')
+    parser.add_argument(
+        '--tf32', default=True, action=argparse.BooleanOptionalAction,
+        help='Use TF32 on GPUs with compute capability 8.0 or higher '
+             '(--no-tf32 computes FP32 operations with full precision)')
+    parser.add_argument(
+        '--optimize', default=False, action=argparse.BooleanOptionalAction,
+        help='Freeze the model and optimize it for inference')
     parser.add_argument(
-        '--verbose', action='store_true', help='Verbose mode')
+        '--verbose', default=False, action=argparse.BooleanOptionalAction, help='Verbose mode')
+    parser.add_argument(
+        '--config', type=str, default=None,
+        help='JSON file of default option values (default: None)')
+
+    # Options in the configuration file are inserted before the command line options
+    # (they are validated in the same way, and the command line options take precedence)
+    args, _ = parser.parse_known_args()
+
+    if args.config is None:
+        return parser.parse_args()
+
+    try:
+        config = json.loads(Path(args.config).read_text())
+    except (OSError, ValueError) as e:
+        parser.error(f'cannot load {args.config}: {e}')
+
+    if not isinstance(config, dict):
+        parser.error(f'invalid configuration in {args.config}: not an object')
 
-    args = parser.parse_args()
-    args.gpus, args.fp16 = get_default_gpus(args.gpus, args.fp16)
+    config_args = []
 
-    return args
+    for key, value in config.items():
+        name = str(key).lstrip('-').replace('_', '-')
+        dest = name.replace('-', '_')
+
+        if dest not in args or dest in ('model', 'config'):
+            parser.error(f'invalid option in {args.config}: {key}')
+
+        # Flags are specified with boolean values
+        # (only flags that change the default are added, to respect mutually exclusive flags)
+        if isinstance(parser.get_default(dest), bool):
+            if not isinstance(value, bool):
+                parser.error(f'invalid value in {args.config}: {key}: {value!r}')
+            elif value != parser.get_default(dest):
+                config_args.append(f'--{name}' if value else f'--no-{name}')
+        elif isinstance(value, list):
+            config_args.append(f'--{name}={",".join(map(str, value))}')
+        elif value is not None:
+            config_args.append(f'--{name}={value}')
+
+    return parser.parse_args(config_args + sys.argv[1:])
 
 
 def main() -> None:
     args = parse_args()
 
+    # Set the number of OpenMP/MKL threads if specified
+    if args.torch_threads is not None:
+        os.environ['OMP_NUM_THREADS'] = str(max(1, args.torch_threads))
+        os.environ['MKL_NUM_THREADS'] = str(max(1, args.torch_threads))
+
+    # Import modules using PyTorch after parsing arguments
+    # (PyTorch takes time to load, so it is not loaded when only showing help)
+    import torch
+    from deepgo.gpu import get_default_batch_size, get_default_gpus, warm_up_processor
+    from deepgo.gtp import GTPEngine
+    from deepgo.processor import Processor
+
     # Set up log output
     start_logging(debug=args.verbose, console=sys.stderr)
 
+    # Select GPUs and precision available in the execution environment
+    args.gpus, args.fp16, args.bf16 = get_default_gpus(args.gpus, args.fp16, args.bf16)
+
+    # Configure PyTorch threads
+    # (if GPUs are used, limit threads to avoid contention with search threads)
+    if args.torch_threads is not None:
+        torch.set_num_threads(max(1, args.torch_threads))
+    elif -1 not in args.gpus:
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) // max(1, args.threads)))
+
+    torch.set_num_interop_threads(1)
+
     # Configure GPU settings
     if torch.cuda.device_count() != 0:
         torch.backends.cudnn.enabled = True
         torch.backends.cudnn.benchmark = True
         torch.backends.cudnn.deterministic = False
 
-    # Check game rules
-    if args.rule == 'ch':
-        rule = RULE_CH
-    elif args.rule == 'jp':
-        rule = RULE_JP
-    elif args.rule == 'com':
-        rule = RULE_COM
-    else:
-        raise ValueError(f'Invalid rule: {args.rule}')
+        # Compute FP32 operations with TF32 if all GPUs support it (compute capability 8.0+)
+        cuda_gpus = [gpu for gpu in args.gpus if gpu >= 0]
+
+        if args.tf32 and len(cuda_gpus) != 0 and all(
+                torch.cuda.get_device_capability(gpu)[0] >= 8 for gpu in cuda_gpus):
+            torch.backends.cuda.matmul.allow_tf32 = True
+            torch.backends.cudnn.allow_tf32 = True
+            torch.set_float32_matmul_precision('high')
+        # Otherwise, compute FP32 operations with full precision if TF32 is disabled
+        # (cuDNN uses TF32 for convolutions by default)
+        elif not args.tf32:
+            torch.backends.cuda.matmul.allow_tf32 = False
+            torch.backends.cudnn.allow_tf32 = False
+            torch.set_float32_matmul_precision('highest')
+
+    # Tune the batch size if not specified
+    if args.batch_size is None:
+        args.batch_size = get_default_batch_size(
+            args.model, args.gpus, fp16=args.fp16, bf16=args.bf16, optimize=args.optimize)
 
     # Create inference object
-    processor = Processor(args.model, args.gpus, args.batch_size, args.fp16)
+    processor = Processor(
+        args.model, args.gpus, args.batch_size,
+        fp16=args.fp16, bf16=args.bf16, optimize=args.optimize,
+        threads_par_gpu=max(1, args.streams))
+
+    # Run inference in advance to avoid the delay of the first move
+    warm_up_processor(
+        processor, args.gpus, args.batch_size, threads_par_gpu=max(1, args.streams))
 
     # Create GPT object
     engine = GTPEngine(
@@ -111,11 +211,12 @@ def main() -> None:
         temperature=args.temperature,
         randomness=args.randomness,
         criterion=args.criterion,
-        rule=rule,
+        rule=RULES[args.rule],
         boardsize=args.boardsize,
         komi=args.komi,
         superko=args.superko,
         eval_leaf_only=args.eval_leaf_only,
+        virtual_loss=args.virtual_loss,
         timelimit=args.timelimit,
         ponder=args.ponder,
         resign_threshold=args.resign,
@@ -0,0 +1,46 @@
+import io
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parents[1] / 'src'))
+
+# Game records are read without the board engine, so tests can run without the native build
+try:
+    import deepgo.native  # noqa: F401
+except ImportError:
+    sys.modules['deepgo.native'] = types.SimpleNamespace(NativeBoard=None)  # type: ignore
+
+from deepgo import record  # noqa: E402
+
+SGF_TEXT = '(;GM[1]FF[4]SZ[19]PB[黒番太郎]PW[白番花子]C[日本語のコメント];B[pd];W[dp]C[次の一手])'
+
+# Text whose EUC-JP bytes can also be decoded as Shift_JIS
+EUC_JP_TEXT = '(;GM[1]FF[4]SZ[19]PB[先番]PW[名人]C[対局];B[pd])'
+
+
+@pytest.mark.parametrize('charset', ['utf-8', 'shift-jis', 'euc-jp', 'iso-2022-jp'])
+def test_read_text(charset: str) -> None:
+    binary = SGF_TEXT.encode(charset)
+    assert record._read_text(io.BytesIO(binary)) == SGF_TEXT
+
+
+def test_read_text_euc_jp() -> None:
+    binary = EUC_JP_TEXT.encode('euc-jp')
+    binary.decode('shift-jis')
+
+    assert record._read_text(io.BytesIO(binary)) == EUC_JP_TEXT
+
+
+def test_record_iso_2022_jp(tmp_path: Path) -> None:
+    path = tmp_path / 'game.sgf'
+    path.write_bytes(SGF_TEXT.encode('iso-2022-jp'))
+
+    data = record.Record(path)
+
+    assert b'\x1b' in path.read_bytes()
+    assert data.properties['pb'] == '黒番太郎'
+    assert data.properties['pw'] == '白番花子'
+    assert data.moves[1][2] == '次の一手'